@@ -6,27 +6,38 @@ Exports all CWE-based findings into a single consolidated CSV.
 Performs coverage analysis and IoU computation.
 """
 
+import asyncio
 import subprocess
 import json
 import sys
+import types
 import os
-import csv
+import hashlib
 import re
-from collections import defaultdict
-from typing import Dict, List, Set, Optional
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, reduce
+from importlib.util import find_spec
+from operator import and_, or_
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Set, Optional, Tuple
+import matplotlib
+matplotlib.use('Agg')  # Render to files only; no display needed
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
 
 # === CWE Top 25 Most Dangerous Software Weaknesses (2024) ===
-CWE_TOP_25_2024 = {
+# Entries are interned so membership tests against mapped CWE IDs compare by identity first
+CWE_TOP_25_2024 = frozenset(map(sys.intern, {
     'CWE-79', 'CWE-787', 'CWE-89', 'CWE-352', 'CWE-22',
     'CWE-125', 'CWE-78', 'CWE-416', 'CWE-862', 'CWE-434',
     'CWE-94', 'CWE-20', 'CWE-77', 'CWE-287', 'CWE-269',
     'CWE-502', 'CWE-200', 'CWE-863', 'CWE-918', 'CWE-119',
     'CWE-476', 'CWE-798', 'CWE-190', 'CWE-400', 'CWE-306'
-}
+}))
 
 # === Repositories to scan ===
 REPOSITORIES = [
@@ -35,7 +46,18 @@ REPOSITORIES = [
     ("https://github.com/psf/requests.git", "Requests")
 ]
 
+# Tool findings are cached here, keyed by tool, repository commit and command line
+CACHE_DIR = ".cache"
+
+# Repositories are scanned concurrently, so each scanner gets its share of the
+# cores rather than all of them
+TOOL_JOBS = max(1, (os.cpu_count() or 1) // len(REPOSITORIES))
+
 # === Utility Helpers ===
+_CWE_RE = re.compile(r'CWE[-_]?(\d+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
 def normalize_cwe_id(cwe_string: str) -> Optional[str]:
     """
     Extract and normalize CWE ID from various formats.
@@ -46,43 +68,149 @@ def normalize_cwe_id(cwe_string: str) -> Optional[str]:
     """
     if not cwe_string:
         return None
+    s = cwe_string if isinstance(cwe_string, str) else str(cwe_string)
     
     # Extract CWE-XXX pattern
-    match = re.search(r'CWE[-_]?(\d+)', str(cwe_string), re.IGNORECASE)
+    match = _CWE_RE.search(s)
     if match:
         return f"CWE-{match.group(1)}"
     
     # If it's just a number
-    if str(cwe_string).isdigit():
-        return f"CWE-{cwe_string}"
+    if s.isdigit():
+        return f"CWE-{s}"
     
     return None
 
 
+@lru_cache(maxsize=1024)
 def is_in_top_25(cwe_id: str) -> str:
     """Check if a CWE ID is in the Top 25 list."""
     normalized = normalize_cwe_id(cwe_id)
     return "Yes" if normalized and normalized in CWE_TOP_25_2024 else "No"
 
 
-def run_subprocess(cmd: List[str], check=False) -> subprocess.CompletedProcess:
-    return subprocess.run(cmd, check=check, capture_output=True, text=True, encoding="utf-8", errors="replace")
+CSV_FIELDS = ["Project_name", "Tool_name", "CWE_ID", "Number_of_Findings", "Is_In_CWE_Top_25"]
 
 
-def safe_project_dir_name(name: str) -> str:
-    return "".join(c if (c.isalnum() or c in ("_", "-")) else "_" for c in name).lower()
+def build_cwe_rows(repo_name: str, tool_name: str, cwes: Iterable[str]) -> List[Dict]:
+    """Count normalized CWE IDs for one (repo, tool) pair and build the CSV rows."""
+    # Counter consumes the iterable in a C loop, without materializing a list
+    counts = Counter(cwes)
+    return [{
+        "Project_name": repo_name,
+        "Tool_name": tool_name,
+        "CWE_ID": c,
+        "Number_of_Findings": n,
+        "Is_In_CWE_Top_25": "Yes" if c in CWE_TOP_25_2024 else "No"
+    } for c, n in counts.most_common()]
 
 
-def install_tool(tool_name: str, package_name: Optional[str] = None):
-    """Ensure tool is installed."""
-    package_name = package_name or tool_name
+def run_subprocess(cmd: List[str], check=False, text=False) -> subprocess.CompletedProcess:
+    # Output is only decoded when the caller actually reads it as text
+    if text:
+        return subprocess.run(cmd, check=check, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    return subprocess.run(cmd, check=check, capture_output=True)
+
+
+def tool_cache_path(tool_name: str, repo_path: str, cmd: List[str]) -> Optional[str]:
+    """Return the findings cache file for `cmd` run on the repo's current commit."""
+    result = run_subprocess(["git", "-C", repo_path, "rev-parse", "HEAD"], text=True)
+    if result.returncode != 0:
+        return None
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # A changed config or flag gets its own file instead of replaying old findings
+    cmd_key = hashlib.blake2b("\0".join(cmd).encode("utf-8"), digest_size=4).hexdigest()
+    return os.path.join(CACHE_DIR, f"{tool_name}-{result.stdout.strip()}-{cmd_key}.jsonl")
+
+
+def scan_exit_ok(returncode: int) -> bool:
+    """Semgrep and Bandit exit with 0 for a clean scan and 1 when they report findings."""
+    return returncode in (0, 1)
+
+
+def iter_findings(cmd: List[str], prefix: str, cache_path: Optional[str] = None,
+                  exit_ok: Callable[[int], bool] = scan_exit_ok) -> Iterator[Dict]:
+    """
+    Run a scanner and stream the JSON objects found under `prefix` in its
+    stdout one at a time, instead of buffering and parsing the whole report.
+    If `cache_path` is given, findings are replayed from it when present and
+    written to it (one JSON object per line) after a complete scan whose
+    exit status passes `exit_ok`.
+    """
+    if cache_path and os.path.exists(cache_path):
+        print(f"[+] Using cached findings from {cache_path}")
+        with open(cache_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+        return
+
+    # Imported here rather than at the top so main() can install it first
+    import ijson
+
+    # stderr goes to a file so a chatty tool can't block on a full pipe
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+    # A unique temp file lets concurrent scans of the same commit write safely
+    cache = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(cache_path),
+                                        suffix=".tmp", delete=False) if cache_path else None
+    complete = False
     try:
-        run_subprocess([tool_name, "--version"], check=True)
-        print(f"[+] {tool_name} is already installed")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print(f"[*] Installing {package_name} ...")
-        run_subprocess([sys.executable, "-m", "pip", "install", package_name], check=True)
-        print(f"[+] {package_name} installed successfully")
+        # use_float decodes non-integral numbers as float (like json.loads)
+        # rather than constructing a Decimal for each one
+        for item in ijson.items(proc.stdout, prefix, use_float=True):
+            if cache:
+                cache.write(json.dumps(item) + "\n")
+            yield item
+        complete = True
+    except ijson.JSONError as e:
+        print(f"[!] {cmd[0]} output parsing error: {e}")
+    finally:
+        proc.stdout.close()
+        proc.wait()
+        # A failed run can still print a well-formed report (e.g. Semgrep with
+        # no rules loaded), so the exit status decides too
+        if not exit_ok(proc.returncode):
+            complete = False
+            errors.seek(0)
+            print(f"[!] {cmd[0]} exited with status {proc.returncode}:")
+            print(errors.read().decode("utf-8", errors="replace").rstrip())
+        errors.close()
+        if cache:
+            cache.close()
+            # Only keep the cache for a fully parsed report from a normal run
+            if complete:
+                os.replace(cache.name, cache_path)
+            else:
+                os.remove(cache.name)
+
+
+# ASCII characters that are not alphanumeric, '_' or '-' map to '_'
+_SAFE_NAME_TABLE = {i: "_" for i in range(128) if not (chr(i).isalnum() or chr(i) in "_-")}
+_UNSAFE_NAME_RE = re.compile(r'[^\w-]')
+
+
+def safe_project_dir_name(name: str) -> str:
+    if name.isascii():
+        return name.translate(_SAFE_NAME_TABLE).lower()
+    return _UNSAFE_NAME_RE.sub("_", name).lower()
+
+
+def install_requirements(tools: List[str], libraries: Mapping[str, str]):
+    """
+    Install every missing tool and library with a single pip call.
+    `libraries` maps each import name to its pip package (PIL -> Pillow).
+    """
+    missing = []
+    if not os.environ.get("SKIP_TOOL_INSTALL"):
+        # A tool counts as present if its CLI is on PATH or its package is importable
+        missing += [t for t in tools if not shutil.which(t) and find_spec(t) is None]
+    missing += [pkg for module, pkg in libraries.items() if find_spec(module) is None]
+    if not missing:
+        print("[+] All tools and analysis libraries are already installed")
+        return
+    print(f"[*] Installing {', '.join(missing)} ...")
+    run_subprocess([sys.executable, "-m", "pip", "install", *missing], check=True)
+    print("[+] Installed missing packages successfully")
 
 
 def clone_repository(repo_url: str, target_dir: str) -> Optional[str]:
@@ -92,7 +220,12 @@ def clone_repository(repo_url: str, target_dir: str) -> Optional[str]:
         print(f"[!] Directory {target_dir} already exists. Using existing directory.")
         return target_dir
     try:
-        run_subprocess(["git", "clone", repo_url, target_dir], check=True)
+        # Scanners only need the current tree of the default branch: skip history,
+        # other branches and tags, and lazily fetch blobs
+        run_subprocess(
+            ["git", "clone", "--depth=1", "--single-branch", "--no-tags", "--filter=blob:none", repo_url, target_dir],
+            check=True, text=True,
+        )
         print(f"[+] Repository cloned successfully to {target_dir}")
         return target_dir
     except subprocess.CalledProcessError as e:
@@ -101,29 +234,29 @@ def clone_repository(repo_url: str, target_dir: str) -> Optional[str]:
 
 
 # === SEMGREP ===
-def run_semgrep(repo_path: str) -> Dict:
-    print("[*] Running Semgrep scan...")
+def run_semgrep(repo_path: str) -> Iterator[Dict]:
+    print(f"[*] Running Semgrep scan on {repo_path}...")
     cmd = [
         "semgrep",
         "--config=p/security-audit",
         "--config=p/python",
         "--json",
         "--metrics=off",
+        f"--jobs={TOOL_JOBS}",
         repo_path
     ]
-    result = run_subprocess(cmd)
-    try:
-        return json.loads(result.stdout)
-    except Exception:
-        return {"results": []}
+    return iter_findings(cmd, "results.item", tool_cache_path("semgrep", repo_path, cmd))
+
+
+_EMPTY_CWES: frozenset = frozenset()
 
 
 def extract_cwes_semgrep(finding: Dict) -> Set[str]:
     """Extract and normalize CWE IDs from Semgrep findings."""
+    metadata = finding.get("extra", {}).get("metadata")
+    if not metadata or ("cwe" not in metadata and "references" not in metadata):
+        return _EMPTY_CWES
     cwes = set()
-    metadata = finding.get("extra", {}).get("metadata", {})
-    if not metadata:
-        return cwes
     
     # Check 'cwe' field
     if "cwe" in metadata:
@@ -142,260 +275,245 @@ def extract_cwes_semgrep(finding: Dict) -> Set[str]:
     if "references" in metadata:
         for ref in metadata["references"]:
             if isinstance(ref, str) and "cwe.mitre.org" in ref:
-                cwe_id = ref.split("/")[-1].replace(".html", "")
-                normalized = normalize_cwe_id(cwe_id)
+                # Only the last path segment names the CWE (.../definitions/79.html)
+                normalized = normalize_cwe_id(ref.rsplit("/", 1)[-1].replace(".html", ""))
                 if normalized:
                     cwes.add(normalized)
     
     return cwes
 
 
-def aggregate_semgrep(repo_name: str, data: Dict) -> List[Dict]:
-    counts = defaultdict(int)
-    for f in data.get("results", []):
-        cwes = extract_cwes_semgrep(f)
-        if not cwes:
-            cwes = {"CWE-UNKNOWN"}
-        for c in cwes:
-            counts[c] += 1
-    
-    return [{
-        "Project_name": repo_name,
-        "Tool_name": "Semgrep",
-        "CWE_ID": c,
-        "Number_of_Findings": n,
-        "Is_In_CWE_Top_25": is_in_top_25(c)
-    } for c, n in counts.items()]
+def aggregate_semgrep(repo_name: str, findings: Iterable[Dict]) -> List[Dict]:
+    cwes = (c for f in findings for c in (extract_cwes_semgrep(f) or ("CWE-UNKNOWN",)))
+    return build_cwe_rows(repo_name, "Semgrep", cwes)
 
 
 # === BANDIT ===
-BANDIT_CWE_MAPPING = {
+# Several Bandit tests map to more than one CWE, so entries are listed as
+# (test_id, cwes) pairs and merged below instead of using a dict literal,
+# which would silently keep only the last value for a repeated key.
+_BANDIT_CWE_ENTRIES = [
     # SQL Injection
-    'B608': ['CWE-89'],
+    ('B608', ('CWE-89',)),
     
     # Path Traversal
-    'B308': ['CWE-22'],
-    'B310': ['CWE-22'],
+    ('B308', ('CWE-22',)),
+    ('B310', ('CWE-22',)),
     
     # Command Injection
-    'B102': ['CWE-78'],
-    'B601': ['CWE-78'],
-    'B602': ['CWE-78'],
-    'B603': ['CWE-78'],
-    'B604': ['CWE-78'],
-    'B605': ['CWE-78'],
-    'B606': ['CWE-78'],
-    'B607': ['CWE-78'],
+    ('B102', ('CWE-78',)),
+    ('B601', ('CWE-78',)),
+    ('B602', ('CWE-78',)),
+    ('B603', ('CWE-78',)),
+    ('B604', ('CWE-78',)),
+    ('B605', ('CWE-78',)),
+    ('B606', ('CWE-78',)),
+    ('B607', ('CWE-78',)),
     
     # Code Injection / Eval
-    'B307': ['CWE-94'],
-    'B313': ['CWE-94'],
-    'B314': ['CWE-94'],
-    'B315': ['CWE-94'],
-    'B703': ['CWE-94'],
+    ('B307', ('CWE-94',)),
+    ('B313', ('CWE-94',)),
+    ('B314', ('CWE-94',)),
+    ('B315', ('CWE-94',)),
+    ('B703', ('CWE-94',)),
     
     # Deserialization
-    'B301': ['CWE-502'],
-    'B302': ['CWE-502'],
-    'B303': ['CWE-502'],
-    'B304': ['CWE-502'],
-    'B305': ['CWE-502'],
-    'B306': ['CWE-502'],
-    'B403': ['CWE-502'],
-    'B404': ['CWE-502'],
-    'B405': ['CWE-502'],
-    'B406': ['CWE-502'],
-    'B407': ['CWE-502'],
-    'B408': ['CWE-502'],
-    'B409': ['CWE-502'],
-    'B410': ['CWE-502'],
-    'B411': ['CWE-502'],
-    'B412': ['CWE-502'],
-    'B413': ['CWE-502'],
-    'B506': ['CWE-502'],
+    ('B301', ('CWE-502',)),
+    ('B302', ('CWE-502',)),
+    ('B303', ('CWE-502',)),
+    ('B304', ('CWE-502',)),
+    ('B305', ('CWE-502',)),
+    ('B306', ('CWE-502',)),
+    ('B403', ('CWE-502',)),
+    ('B404', ('CWE-502',)),
+    ('B405', ('CWE-502',)),
+    ('B406', ('CWE-502',)),
+    ('B407', ('CWE-502',)),
+    ('B408', ('CWE-502',)),
+    ('B409', ('CWE-502',)),
+    ('B410', ('CWE-502',)),
+    ('B411', ('CWE-502',)),
+    ('B412', ('CWE-502',)),
+    ('B413', ('CWE-502',)),
+    ('B506', ('CWE-502',)),
     
     # Hardcoded Credentials
-    'B105': ['CWE-798'],
-    'B106': ['CWE-798'],
-    'B107': ['CWE-798'],
+    ('B105', ('CWE-798',)),
+    ('B106', ('CWE-798',)),
+    ('B107', ('CWE-798',)),
     
     # Weak Cryptography
-    'B303': ['CWE-327'],
-    'B304': ['CWE-327'],
-    'B305': ['CWE-327'],
-    'B324': ['CWE-327'],
-    'B501': ['CWE-327'],
-    'B502': ['CWE-327'],
-    'B503': ['CWE-327'],
-    'B504': ['CWE-327'],
-    'B505': ['CWE-327'],
+    ('B303', ('CWE-327',)),
+    ('B304', ('CWE-327',)),
+    ('B305', ('CWE-327',)),
+    ('B324', ('CWE-327',)),
+    ('B501', ('CWE-327',)),
+    ('B502', ('CWE-327',)),
+    ('B503', ('CWE-327',)),
+    ('B504', ('CWE-327',)),
+    ('B505', ('CWE-327',)),
     
     # Weak Random
-    'B311': ['CWE-330'],
+    ('B311', ('CWE-330',)),
     
     # XML vulnerabilities
-    'B317': ['CWE-611'],
-    'B318': ['CWE-611'],
-    'B320': ['CWE-611'],
-    'B405': ['CWE-611'],
+    ('B317', ('CWE-611',)),
+    ('B318', ('CWE-611',)),
+    ('B320', ('CWE-611',)),
+    ('B405', ('CWE-611',)),
     
     # Insecure temp file
-    'B108': ['CWE-377'],
+    ('B108', ('CWE-377',)),
     
     # Flask debug mode
-    'B201': ['CWE-489'],
+    ('B201', ('CWE-489',)),
     
     # Improper Certificate Validation
-    'B501': ['CWE-295'],
+    ('B501', ('CWE-295',)),
     
     # Try/except pass
-    'B110': ['CWE-703'],
+    ('B110', ('CWE-703',)),
     
     # Assert used
-    'B101': ['CWE-703'],
+    ('B101', ('CWE-703',)),
     
     # exec used
-    'B102': ['CWE-94'],
+    ('B102', ('CWE-94',)),
     
     # Binding to all interfaces
-    'B104': ['CWE-200'],
+    ('B104', ('CWE-200',)),
     
     # Request without timeout
-    'B113': ['CWE-400'],
+    ('B113', ('CWE-400',)),
     
     # Django XSS
-    'B308': ['CWE-79'],
-    'B703': ['CWE-79'],
-}
+    ('B308', ('CWE-79',)),
+    ('B703', ('CWE-79',)),
+]
 
+_bandit_cwes: Dict[str, Tuple[str, ...]] = {}
+for _test_id, _cwes in _BANDIT_CWE_ENTRIES:
+    # dict.fromkeys dedupes while keeping the first-seen order
+    _bandit_cwes[_test_id] = tuple(dict.fromkeys(_bandit_cwes.get(_test_id, ()) + _cwes))
 
-def run_bandit(repo_path: str) -> Dict:
-    print("[*] Running Bandit scan...")
-    result = run_subprocess(["bandit", "-r", repo_path, "-f", "json", "-ll"])
-    try:
-        return json.loads(result.stdout)
-    except Exception:
-        return {"results": []}
+BANDIT_CWE_MAPPING: Mapping[str, Tuple[str, ...]] = types.MappingProxyType(
+    {k: tuple(map(sys.intern, v)) for k, v in _bandit_cwes.items()})
 
 
-def aggregate_bandit(repo_name: str, data: Dict) -> List[Dict]:
-    counts = defaultdict(int)
-    for f in data.get("results", []):
-        test_id = f.get("test_id")
-        cwes = BANDIT_CWE_MAPPING.get(test_id, ["CWE-UNKNOWN"])
-        for c in cwes:
-            counts[c] += 1
-    
-    return [{
-        "Project_name": repo_name,
-        "Tool_name": "Bandit",
-        "CWE_ID": c,
-        "Number_of_Findings": n,
-        "Is_In_CWE_Top_25": is_in_top_25(c)
-    } for c, n in counts.items()]
+def run_bandit(repo_path: str) -> Iterator[Dict]:
+    print(f"[*] Running Bandit scan on {repo_path}...")
+    cmd = ["bandit", "-r", repo_path, "-f", "json", "-ll"]
+    return iter_findings(cmd, "results.item", tool_cache_path("bandit", repo_path, cmd))
+
+
+def extract_cwes_bandit(finding: Dict) -> Tuple[str, ...]:
+    """Map a Bandit finding to its CWE IDs via its test ID."""
+    return BANDIT_CWE_MAPPING.get(finding.get("test_id"), ("CWE-UNKNOWN",))
+
+
+def aggregate_bandit(repo_name: str, findings: Iterable[Dict]) -> List[Dict]:
+    cwes = (c for f in findings for c in extract_cwes_bandit(f))
+    return build_cwe_rows(repo_name, "Bandit", cwes)
 
 
 # === PYLINT ===
-# Pylint message to CWE mapping based on common security patterns
-PYLINT_CWE_MAPPING = {
+# Pylint message to CWE mapping based on common security patterns,
+# keyed by (message-id, symbol)
+_PYLINT_CWE_ENTRIES = {
     # Code execution vulnerabilities
-    'W0123': ['CWE-94'],  # eval-used
-    'W0611': ['CWE-561'], # unused-import (dead code)
-    'W0612': ['CWE-563'], # unused-variable (dead code)
+    ('W0123', 'eval-used'): ('CWE-94',),
+    ('W0611', 'unused-import'): ('CWE-561',),  # dead code
+    ('W0612', 'unused-variable'): ('CWE-563',),  # dead code
     
     # Exception handling
-    'W0702': ['CWE-703'], # bare-except
-    'W0703': ['CWE-703'], # broad-except
-    'W0705': ['CWE-703'], # duplicate-except
-    'E0711': ['CWE-703'], # notimplemented-raised
+    ('W0702', 'bare-except'): ('CWE-703',),
+    ('W0703', 'broad-except'): ('CWE-703',),
+    ('W0705', 'duplicate-except'): ('CWE-703',),
+    ('E0711', 'notimplemented-raised'): ('CWE-703',),
     
     # Import issues
-    'E0401': ['CWE-829'], # import-error (untrusted source)
+    ('E0401', 'import-error'): ('CWE-829',),  # untrusted source
     
     # SQL Injection potential
-    'W1401': ['CWE-89'],  # anomalous-backslash-in-string (potential SQL)
+    ('W1401', 'anomalous-backslash-in-string'): ('CWE-89',),  # potential SQL
     
     # Dangerous functions
-    'W1505': ['CWE-676'], # deprecated-method (using deprecated/dangerous APIs)
+    ('W1505', 'deprecated-method'): ('CWE-676',),  # using deprecated/dangerous APIs
     
     # Information exposure
-    'W1201': ['CWE-532'], # logging-not-lazy (may log sensitive data)
-    'W1202': ['CWE-532'], # logging-format-interpolation
+    ('W1201', 'logging-not-lazy'): ('CWE-532',),  # may log sensitive data
+    ('W1202', 'logging-format-interpolation'): ('CWE-532',),
     
     # Input validation
-    'W0106': ['CWE-20'],  # expression-not-assigned (improper input handling)
+    ('W0106', 'expression-not-assigned'): ('CWE-20',),  # improper input handling
     
     # Weak cryptography indicators
-    'C0103': ['CWE-330'], # invalid-name (e.g., weak random seed names)
+    ('C0103', 'invalid-name'): ('CWE-330',),  # e.g., weak random seed names
     
     # Resource management
-    'W1514': ['CWE-400'], # unspecified-encoding
-    'R1732': ['CWE-404'], # consider-using-with (resource leak)
-    'W1509': ['CWE-404'], # subprocess-popen-preexec-fn
+    ('W1514', 'unspecified-encoding'): ('CWE-400',),
+    ('R1732', 'consider-using-with'): ('CWE-404',),  # resource leak
+    ('W1509', 'subprocess-popen-preexec-fn'): ('CWE-404',),
     
     # Type confusion
-    'E1101': ['CWE-843'], # no-member (type confusion)
-    'E1102': ['CWE-843'], # not-callable
+    ('E1101', 'no-member'): ('CWE-843',),  # type confusion
+    ('E1102', 'not-callable'): ('CWE-843',),
     
     # Path traversal potential
-    'W1113': ['CWE-22'],  # keyword-arg-before-vararg (path manipulation)
+    ('W1113', 'keyword-arg-before-vararg'): ('CWE-22',),  # path manipulation
     
     # Expanded mappings to reduce UNKNOWNs
-    'E0001': ['CWE-20'],   # syntax-error (input validation)
-    'E1136': ['CWE-843'],  # unsubscriptable-object (type confusion)
-    'E1120': ['CWE-20'],   # no-value-for-parameter
-    'E1121': ['CWE-20'],   # too-many-function-args
-    'E1133': ['CWE-664'],  # not-an-iterable (improper resource use)
-    'E0102': ['CWE-710'],  # function-redefined
-    'W0101': ['CWE-691'],  # unreachable (control flow)
-    'W0622': ['CWE-732'],  # redefined-builtin (privilege issue)
-    'W0613': ['CWE-563'],  # unused-argument
-    'R1705': ['CWE-691'],  # no-else-return
+    ('E0001', 'syntax-error'): ('CWE-20',),  # input validation
+    ('E1136', 'unsubscriptable-object'): ('CWE-843',),  # type confusion
+    ('E1120', 'no-value-for-parameter'): ('CWE-20',),
+    ('E1121', 'too-many-function-args'): ('CWE-20',),
+    ('E1133', 'not-an-iterable'): ('CWE-664',),  # improper resource use
+    ('E0102', 'function-redefined'): ('CWE-710',),
+    ('W0101', 'unreachable'): ('CWE-691',),  # control flow
+    ('W0622', 'redefined-builtin'): ('CWE-732',),  # privilege issue
+    ('W0613', 'unused-argument'): ('CWE-563',),
+    ('R1705', 'no-else-return'): ('CWE-691',),
 }
 
+# Both the message-id and the symbol map to the same CWE tuple, so a message
+# resolves with a single lookup whichever key the report provides
+_pylint_cwes: Dict[str, Tuple[str, ...]] = {}
+for (_msg_id, _symbol), _cwes in _PYLINT_CWE_ENTRIES.items():
+    _pylint_cwes[_msg_id] = _pylint_cwes[_symbol] = tuple(map(sys.intern, _cwes))
 
-def run_pylint(repo_path: str) -> Dict:
-    """Run Pylint and return JSON output."""
-    print("[*] Running Pylint scan...")
+PYLINT_CWE_MAPPING: Mapping[str, Tuple[str, ...]] = types.MappingProxyType(_pylint_cwes)
+
+
+def pylint_exit_ok(returncode: int) -> bool:
+    """Pylint's exit status is a bit field; only fatal (1) and usage error (32) mean the run failed."""
+    return returncode >= 0 and not returncode & (1 | 32)
+
+
+def run_pylint(repo_path: str) -> Iterator[Dict]:
+    """Run Pylint and stream its JSON messages."""
+    print(f"[*] Running Pylint scan on {repo_path}...")
     cmd = [
         "pylint",
         repo_path,
-        "--output-format=json",
+        "--output-format=json2",
         "--disable=C,R",  # Disable convention and refactoring, focus on warnings and errors
-        "--exit-zero"  # Don't fail on warnings
+        "--exit-zero",  # Don't fail on warnings
+        "-j", str(TOOL_JOBS)  # This repository's share of the cores
     ]
-    result = run_subprocess(cmd)
-    try:
-        return {"results": json.loads(result.stdout)}
-    except Exception as e:
-        print(f"[!] Pylint parsing error: {e}")
-        return {"results": []}
+    return iter_findings(cmd, "messages.item", tool_cache_path("pylint", repo_path, cmd), pylint_exit_ok)
+
 
+def extract_cwes_pylint(finding: Dict) -> Tuple[str, ...]:
+    """Map a Pylint message to its CWE IDs; unmapped messages yield none."""
+    # json2 reports use "messageId"; the legacy json format used "message-id"
+    msg_id = finding.get("messageId") or finding.get("message-id")
+    return PYLINT_CWE_MAPPING.get(msg_id) or PYLINT_CWE_MAPPING.get(finding.get("symbol"), ())
 
-def aggregate_pylint(repo_name: str, data: Dict) -> List[Dict]:
+
+def aggregate_pylint(repo_name: str, findings: Iterable[Dict]) -> List[Dict]:
     """Aggregate Pylint findings by CWE."""
-    counts = defaultdict(int)
-    for finding in data.get("results", []):
-        msg_id = finding.get("message-id", "")
-        symbol = finding.get("symbol", "")
-        
-        # Try to map by message-id first, then symbol
-        cwes = PYLINT_CWE_MAPPING.get(msg_id, PYLINT_CWE_MAPPING.get(symbol, ["CWE-UNKNOWN"]))
-        
-        for cwe in cwes:
-            if cwe != "CWE-UNKNOWN":
-                counts[cwe] += 1
-                
-        # for cwe in cwes:       
-        #     counts[cwe] += 1
-    
-    return [{
-        "Project_name": repo_name,
-        "Tool_name": "Pylint",
-        "CWE_ID": c,
-        "Number_of_Findings": n,
-        "Is_In_CWE_Top_25": is_in_top_25(c)
-    } for c, n in counts.items()]
+    cwes = (c for f in findings for c in extract_cwes_pylint(f))
+    return build_cwe_rows(repo_name, "Pylint", cwes)
 
 
 # === ANALYSIS FUNCTIONS ===
@@ -408,20 +526,17 @@ def compute_tool_cwe_coverage(csv_file: str) -> Dict[str, Dict]:
         'coverage_pct': percentage coverage
     }}
     """
-    df = pd.read_csv(csv_file)
-    
-    # Exclude CWE-UNKNOWN from analysis
-    df = df[df['CWE_ID'] != 'CWE-UNKNOWN']
+    # Only the tool and CWE columns are needed, so skip parsing the rest
+    df = pd.read_csv(csv_file, usecols=["Tool_name", "CWE_ID"])
     
-    tools = df['Tool_name'].unique()
+    # Exclude CWE-UNKNOWN from analysis and collect each tool's CWE set in one
+    # pass (sort=False keeps tools in the order they appear in the CSV)
+    grouped = df.loc[df['CWE_ID'] != 'CWE-UNKNOWN'].groupby('Tool_name', sort=False)['CWE_ID'].agg(set)
     coverage_data = {}
     
-    for tool in tools:
-        tool_data = df[df['Tool_name'] == tool]
-        unique_cwes = set(tool_data['CWE_ID'].unique())
-        
+    for tool, unique_cwes in grouped.items():
         # Find intersection with Top 25
-        top25_cwes = unique_cwes.intersection(CWE_TOP_25_2024)
+        top25_cwes = unique_cwes & CWE_TOP_25_2024
         coverage_pct = (len(top25_cwes) / len(CWE_TOP_25_2024)) * 100
         
         coverage_data[tool] = {
@@ -435,32 +550,67 @@ def compute_tool_cwe_coverage(csv_file: str) -> Dict[str, Dict]:
     return coverage_data
 
 
+def compute_cwe_bitmasks(coverage_data: Dict[str, Dict]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Encode each tool's CWE set as an integer bitmask over the union of all
+    detected CWEs, so set algebra becomes bitwise ops and popcounts.
+    Returns: ({tool_name: mask}, {cwe_id: bit})
+    """
+    universe = sorted(set().union(*(data['unique_cwes'] for data in coverage_data.values())))
+    bits = {cwe: 1 << i for i, cwe in enumerate(universe)}
+    masks = {tool: sum(bits[cwe] for cwe in data['unique_cwes'])
+             for tool, data in coverage_data.items()}
+    return masks, bits
+
+
 def compute_iou_matrix(coverage_data: Dict[str, Dict]) -> pd.DataFrame:
     """
     Compute IoU (Jaccard Index) for each tool pair.
-    IoU(A, B) = |A ∩ B| / |A ∪ B|
+    IoU(A, B) = |A ∩ B| / |A ∪ B|, with all pairs computed at once from a
+    tool x CWE membership matrix: intersections are M @ M.T.
     """
     tools = list(coverage_data.keys())
-    n = len(tools)
-    iou_matrix = np.zeros((n, n))
-    
-    for i, tool1 in enumerate(tools):
-        for j, tool2 in enumerate(tools):
-            cwes1 = coverage_data[tool1]['unique_cwes']
-            cwes2 = coverage_data[tool2]['unique_cwes']
-            
-            if i == j:
-                iou_matrix[i][j] = 1.0  # Perfect overlap with itself
-            else:
-                intersection = len(cwes1.intersection(cwes2))
-                union = len(cwes1.union(cwes2))
-                iou_matrix[i][j] = intersection / union if union > 0 else 0.0
-    
+    cwes = sorted(set().union(*(data['unique_cwes'] for data in coverage_data.values())))
+    cwe_idx = {cwe: i for i, cwe in enumerate(cwes)}
+
+    membership = np.zeros((len(tools), len(cwes)), dtype=np.int32)
+    for t, tool in enumerate(tools):
+        for cwe in coverage_data[tool]['unique_cwes']:
+            membership[t, cwe_idx[cwe]] = 1
+
+    intersection = membership @ membership.T
+    sizes = membership.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    iou_matrix = np.divide(intersection, union, out=np.zeros(union.shape), where=union > 0)
+    np.fill_diagonal(iou_matrix, 1.0)  # Perfect overlap with itself
+
     return pd.DataFrame(iou_matrix, index=tools, columns=tools)
 
 
+def figure_key(payload: str) -> str:
+    """Hash of the data behind a figure, stored in the PNG metadata."""
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def is_figure_current(output_file: str, key: str) -> bool:
+    """Check whether an existing PNG was rendered from data with the given key."""
+    if not os.path.exists(output_file):
+        return False
+    from PIL import Image  # Imported lazily, like ijson, so main() can install it first
+    try:
+        with Image.open(output_file) as img:
+            return img.info.get("Description") == key
+    except OSError:
+        return False
+
+
 def visualize_coverage(coverage_data: Dict[str, Dict], output_file: str = "coverage_analysis.png"):
     """Create visualization for CWE coverage analysis."""
+    key = figure_key(json.dumps(coverage_data, sort_keys=True, default=sorted))
+    if is_figure_current(output_file, key):
+        print(f"[+] Coverage visualization in {output_file} is up to date")
+        return
+    
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
     fig.suptitle('Tool-Level CWE Coverage Analysis', fontsize=16, fontweight='bold')
     
@@ -517,24 +667,18 @@ def visualize_coverage(coverage_data: Dict[str, Dict], output_file: str = "cover
     # 4. Venn-style comparison
     ax4 = axes[1, 1]
     
-    # Calculate overlaps
-    all_tools_cwes = set()
-    for tool in tools:
-        all_tools_cwes = all_tools_cwes.union(coverage_data[tool]['unique_cwes'])
+    # Calculate overlaps on the CWE bitmasks
+    masks, _ = compute_cwe_bitmasks(coverage_data)
     
     tool_combinations = []
     for tool in tools:
-        only_this_tool = coverage_data[tool]['unique_cwes'].copy()
-        for other_tool in tools:
-            if other_tool != tool:
-                only_this_tool = only_this_tool - coverage_data[other_tool]['unique_cwes']
-        tool_combinations.append((f'{tool} only', len(only_this_tool)))
+        others = reduce(or_, (masks[other_tool] for other_tool in tools if other_tool != tool), 0)
+        only_this_tool = masks[tool] & ~others
+        tool_combinations.append((f'{tool} only', only_this_tool.bit_count()))
     
     # Common to all
-    common_all = coverage_data[tools[0]]['unique_cwes'].copy()
-    for tool in tools[1:]:
-        common_all = common_all.intersection(coverage_data[tool]['unique_cwes'])
-    tool_combinations.append(('Common to all', len(common_all)))
+    common_all = reduce(and_, (masks[tool] for tool in tools))
+    tool_combinations.append(('Common to all', common_all.bit_count()))
     
     labels = [x[0] for x in tool_combinations]
     values = [x[1] for x in tool_combinations]
@@ -549,13 +693,18 @@ def visualize_coverage(coverage_data: Dict[str, Dict], output_file: str = "cover
         autotext.set_fontweight('bold')
     
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=300, bbox_inches='tight', metadata={'Description': key})
     print(f"[+] Coverage visualization saved to {output_file}")
     plt.close()
 
 
 def visualize_iou_matrix(iou_df: pd.DataFrame, output_file: str = "iou_matrix.png"):
     """Create heatmap visualization for IoU matrix."""
+    key = figure_key(iou_df.to_json())
+    if is_figure_current(output_file, key):
+        print(f"[+] IoU matrix visualization in {output_file} is up to date")
+        return
+    
     plt.figure(figsize=(10, 8))
     
     # Create heatmap
@@ -571,7 +720,7 @@ def visualize_iou_matrix(iou_df: pd.DataFrame, output_file: str = "iou_matrix.pn
     plt.yticks(rotation=0)
     
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=300, bbox_inches='tight', metadata={'Description': key})
     print(f"[+] IoU matrix visualization saved to {output_file}")
     plt.close()
 
@@ -633,100 +782,108 @@ def print_analysis_report(coverage_data: Dict[str, Dict], iou_df: pd.DataFrame):
         print("    → Tools show HIGH SIMILARITY - significant overlap in detection")
         print("    → Recommendation: Any single tool may suffice for basic scanning")
     
-    # Coverage maximization
-    all_cwes = set()
-    all_top25 = set()
-    for tool, data in coverage_data.items():
-        all_cwes = all_cwes.union(data['unique_cwes'])
-        all_top25 = all_top25.union(data['top25_cwes'])
+    # Coverage maximization, using the bitmask encoding of each tool's CWEs
+    masks, bits = compute_cwe_bitmasks(coverage_data)
+    top25_mask = sum(bit for cwe, bit in bits.items() if cwe in CWE_TOP_25_2024)
+    all_cwes = 0
+    for mask in masks.values():
+        all_cwes |= mask
+    all_top25 = all_cwes & top25_mask
     
-    combined_coverage = (len(all_top25) / len(CWE_TOP_25_2024)) * 100
+    combined_coverage = (all_top25.bit_count() / len(CWE_TOP_25_2024)) * 100
     
     print(f"\n[*] Combined Tool Coverage:")
-    print(f"    → All tools together detect {len(all_cwes)} unique CWEs")
-    print(f"    → Combined Top 25 coverage: {len(all_top25)}/25 ({combined_coverage:.1f}%)")
+    print(f"    → All tools together detect {all_cwes.bit_count()} unique CWEs")
+    print(f"    → Combined Top 25 coverage: {all_top25.bit_count()}/25 ({combined_coverage:.1f}%)")
     
     # Find best combination
     print(f"\n[*] Best Tool Combination for Maximum Coverage:")
-    best_combo_cwes = set()
+    covered = 0
     best_combo_tools = []
     
     # Greedy selection: add tool that contributes most new CWEs
-    remaining_tools = list(coverage_data.keys())
+    remaining_tools = list(masks.keys())
     while remaining_tools:
-        max_contribution = 0
-        best_tool = None
-        for tool in remaining_tools:
-            new_cwes = len(coverage_data[tool]['unique_cwes'] - best_combo_cwes)
-            if new_cwes > max_contribution:
-                max_contribution = new_cwes
-                best_tool = tool
+        gains = np.array([(masks[tool] & ~covered).bit_count() for tool in remaining_tools])
+        best = int(gains.argmax())
+        if gains[best] == 0:
+            break  # No remaining tool adds a new CWE
         
-        if best_tool:
-            best_combo_tools.append(best_tool)
-            best_combo_cwes = best_combo_cwes.union(coverage_data[best_tool]['unique_cwes'])
-            remaining_tools.remove(best_tool)
-            top25_in_combo = best_combo_cwes.intersection(CWE_TOP_25_2024)
-            print(f"    → {' + '.join(best_combo_tools)}: "
-                  f"{len(best_combo_cwes)} CWEs, "
-                  f"{len(top25_in_combo)}/25 Top 25 "
-                  f"({len(top25_in_combo)/25*100:.1f}%)")
+        best_tool = remaining_tools.pop(best)
+        best_combo_tools.append(best_tool)
+        covered |= masks[best_tool]
+        top25_in_combo = (covered & top25_mask).bit_count()
+        print(f"    → {' + '.join(best_combo_tools)}: "
+              f"{covered.bit_count()} CWEs, "
+              f"{top25_in_combo}/25 Top 25 "
+              f"({top25_in_combo/25*100:.1f}%)")
     
     print("\n" + "=" * 80)
 
 
 # === MAIN ===
+# (tool name, scan runner, aggregator) for every tool run against each repository
+SCANNERS = [
+    ("Semgrep", run_semgrep, aggregate_semgrep),
+    ("Bandit", run_bandit, aggregate_bandit),
+    ("Pylint", run_pylint, aggregate_pylint),
+]
+
+
+def scan_repository_with(run_tool, aggregate, project_name: str, repo_path: str) -> List[Dict]:
+    """Run one scanner over a repository, aggregating findings as they stream in."""
+    return aggregate(project_name, run_tool(repo_path))
+
+
+async def scan_tools(project_name: str, repo_path: str) -> List[List[Dict]]:
+    """Run every scanner on a repository concurrently, returning rows per tool."""
+    # Each scan blocks on its own tool's stdout pipe while streaming findings,
+    # so it is driven from a worker thread; gather keeps results in tool order
+    return await asyncio.gather(*(
+        asyncio.to_thread(scan_repository_with, run_tool, aggregate, project_name, repo_path)
+        for _, run_tool, aggregate in SCANNERS
+    ))
+
+
+def scan_one(repo_url: str, project_name: str) -> List[Dict]:
+    """Clone one repository and run every scanner on it concurrently."""
+    repo_dir = safe_project_dir_name(project_name)
+    repo_path = clone_repository(repo_url, repo_dir)
+    if not repo_path:
+        print(f"[-] Skipping {project_name} due to clone failure.")
+        return []
+
+    rows = []
+    for tool_rows in asyncio.run(scan_tools(project_name, repo_path)):
+        rows.extend(tool_rows)
+    print(f"[+] Completed scanning for {project_name}")
+    return rows
+
+
 def main():
-    # Install required tools
-    install_tool("semgrep")
-    install_tool("bandit")
-    install_tool("pylint")
-    
-    # Install analysis libraries
-    print("[*] Installing analysis libraries...")
-    for lib in ["matplotlib", "seaborn", "pandas", "numpy"]:
-        try:
-            __import__(lib)
-        except ImportError:
-            run_subprocess([sys.executable, "-m", "pip", "install", lib], check=True)
-
-    consolidated_rows = []
-
-    # Scan all repositories
-    for repo_url, project_name in REPOSITORIES:
-        print("\n" + "=" * 80)
-        print(f"Scanning project: {project_name}")
-        print("=" * 80)
-
-        repo_dir = safe_project_dir_name(project_name)
-        repo_path = clone_repository(repo_url, repo_dir)
-        if not repo_path:
-            print(f"[-] Skipping {project_name} due to clone failure.")
-            continue
-
-        # SEMGREP
-        semgrep_res = run_semgrep(repo_path)
-        semgrep_csv = aggregate_semgrep(project_name, semgrep_res)
-        consolidated_rows.extend(semgrep_csv)
-
-        # BANDIT
-        bandit_res = run_bandit(repo_path)
-        bandit_csv = aggregate_bandit(project_name, bandit_res)
-        consolidated_rows.extend(bandit_csv)
-
-        # PYLINT
-        pylint_res = run_pylint(repo_path)
-        pylint_csv = aggregate_pylint(project_name, pylint_res)
-        consolidated_rows.extend(pylint_csv)
-
-        print(f"[+] Completed scanning for {project_name}\n")
-
-    # Write consolidated CSV
+    # Install required tools and analysis libraries in one pip run
+    install_requirements(
+        ["semgrep", "bandit", "pylint"],
+        {"matplotlib": "matplotlib", "seaborn": "seaborn", "pandas": "pandas",
+         "numpy": "numpy", "ijson": "ijson", "PIL": "Pillow"},
+    )
+
+    # Scan all repositories concurrently; cloning one repository now overlaps
+    # with scanning the others. map() keeps results in REPOSITORIES order.
+    print("\n" + "=" * 80)
+    print(f"Scanning {len(REPOSITORIES)} projects with {len(SCANNERS)} tools")
+    print("=" * 80)
+
+    # Write consolidated CSV, appending each project's rows as it finishes;
+    # the first write truncates the file and emits the header
     csv_out = "cwe_findings.csv"
-    with open(csv_out, "w", newline="", encoding="utf-8") as cf:
-        writer = csv.DictWriter(cf, fieldnames=["Project_name", "Tool_name", "CWE_ID", "Number_of_Findings", "Is_In_CWE_Top_25"])
-        writer.writeheader()
-        writer.writerows(consolidated_rows)
+    first_write = True
+    with ThreadPoolExecutor(max_workers=len(REPOSITORIES)) as executor:
+        for rows in executor.map(lambda repo: scan_one(*repo), REPOSITORIES):
+            pd.DataFrame(rows, columns=CSV_FIELDS).to_csv(
+                csv_out, index=False, mode="w" if first_write else "a", header=first_write
+            )
+            first_write = False
 
     print(f"\n[+] Consolidated CWE findings saved to {csv_out}")
     
@@ -0,0 +1,13 @@
+# Regexes for the CFG builder in cfg_cc.py, compiled once on import
+import re
+
+COMMENT_RE = re.compile(r'//.*|/\*[\s\S]*?\*/')
+
+# One pass per line finds control statements, jumps and braces
+CTRL_RE = re.compile(
+    r'\b(?P<ctrl>if|else if|else|for|while)\b'
+    r'|\b(?P<jmp>return|break|continue)\b'
+    r'|(?P<brace>[{}])'
+)
+
+KIND_RE = re.compile(r'\b(for|while|else\s+if|if|else|return|break)\b')
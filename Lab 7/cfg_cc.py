@@ -1,36 +1,45 @@
 # python cfg_cc.py <program.c>
-import re
+import os
 import sys
+from functools import lru_cache
+from _patterns import COMMENT_RE, CTRL_RE, KIND_RE
+
+# DOT label escapes, applied in one pass by escape_label
+_ESCAPE_TABLE = str.maketrans({
+    "\\": "\\\\", '"': '\\"',
+    "{": "\\{", "}": "\\}",
+    "<": "\\<", ">": "\\>",
+})
 
 def preprocess_code(code):
-    code = re.sub(r'//.*|/\*[\s\S]*?\*/', '', code)
-    lines = [line.strip() for line in code.split('\n') if line.strip()]
+    code = COMMENT_RE.sub('', code)
+    # Strip each line once here; everything downstream relies on it
+    lines = [line for line in (raw.strip() for raw in code.split('\n')) if line]
     # Remove lines that are only { or }
     lines = [line for line in lines if line not in ['{', '}']]
-    return lines
+    # The joined text lets find_leaders rule out branching with a single search
+    return lines, "\n".join(lines)
+
 
+def find_leaders(lines, full_source=None):
+    # Straight-line code: nothing after the first line can start a block
+    if full_source is not None and not CTRL_RE.search(full_source):
+        return [0]
 
-def find_leaders(lines):
     leaders = set()
     leaders.add(0)
     for i, line in enumerate(lines):
-        # Detect control statements
-        if re.search(r'\b(if|else if|else|for|while)\b', line):
-            leaders.add(i)
-            if i + 1 < len(lines):
-                leaders.add(i + 1)
+        kinds = {m.lastgroup for m in CTRL_RE.finditer(line)}
+        if not kinds:
+            continue
 
-        # Detect return/break/continue
-        if re.search(r'\b(return|break|continue)\b', line):
-            if i + 1 < len(lines):
-                leaders.add(i + 1)
-
-        # Detect function or block boundaries
-        if "{" in line or "}" in line:
+        # Control statements and function/block boundaries start a block
+        if "ctrl" in kinds or "brace" in kinds:
             leaders.add(i)
-            if i + 1 < len(lines):
-                leaders.add(i + 1)
 
+        # The line after any of these (including return/break/continue) does too
+        if i + 1 < len(lines):
+            leaders.add(i + 1)
 
     return sorted(list(leaders))
 
@@ -45,99 +54,103 @@ def create_basic_blocks(lines, leaders):
             blocks.append((f'B{len(blocks)}', block_lines))
     return blocks
 
+def block_kinds(block):
+    # Whole-word keywords only, so names like topPerformers or notify do not count
+    return {" ".join(m.group(1).split()) for m in KIND_RE.finditer(" ".join(block))}
+
 def create_edges(blocks):
-    edges = []
+    # A set dedupes repeated edges as they are added
+    edges = set()
     
     # Store labels of blocks that are decision points
     decision_blocks = set() 
     
     for i, (label, block) in enumerate(blocks):
-        code = " ".join(block)
+        kinds = block_kinds(block)
         next_block_label = blocks[i + 1][0] if i + 1 < len(blocks) else None
+        # Block reached when a branch/loop condition is false
+        after_true = blocks[i + 2][0] if i + 2 < len(blocks) else None
 
         # 1. Loops (for/while): Corrected to include the exit edge.
-        if any(k in code for k in ["for", "while"]):
+        if kinds & {"for", "while"}:
             decision_blocks.add(label)
             if next_block_label:
                 # Edge 1: Loop Header (True) -> Body
-                edges.append((label, next_block_label, "true"))
+                edges.add((label, next_block_label, "true"))
                 # Edge 2: Body -> Loop Header (Back edge)
-                edges.append((next_block_label, label, "back"))
+                edges.add((next_block_label, label, "back"))
                 
                 # Edge 3 (CRITICAL FIX): Loop Header (False) -> Loop Exit
                 # This edge is essential for correct CC calculation.
-                if i + 2 < len(blocks):
-                     edges.append((label, blocks[i + 2][0], "false (exit)"))
+                if after_true:
+                     edges.add((label, after_true, "false (exit)"))
             
         # 2. Conditional Branches (if/else if): Modeling both paths.
-        elif "if" in code or "else if" in code:
+        elif kinds & {"if", "else if"}:
             decision_blocks.add(label)
             if next_block_label:
                 # Edge 1: Condition (True) -> True body
-                edges.append((label, next_block_label, "true"))
+                edges.add((label, next_block_label, "true"))
             
             # Edge 2: Condition (False) -> Block *after* the true body (to model the skip)
-            if i + 2 < len(blocks):
-                 edges.append((label, blocks[i + 2][0], "false"))
+            if after_true:
+                 edges.add((label, after_true, "false"))
 
         # 3. Else block: Sequential flow only
-        elif "else" in code:
+        elif "else" in kinds:
             if next_block_label:
-                edges.append((label, next_block_label, ""))
+                edges.add((label, next_block_label, ""))
 
         # 4. Normal sequential flow and Merge flow (Corrected)
         # This handles blocks that are NOT control structures but follow a non-sequential block.
-        elif "return" not in code and label not in decision_blocks:
+        elif "return" not in kinds and label not in decision_blocks:
             
             # We now rely on this block to act as the merge point for preceding IFs/ELSEs 
             # and to carry on the sequential flow if it's not a control flow source.
-            if not any(k in code for k in ["for", "while", "if", "else"]):
-                if next_block_label:
-                     edges.append((label, next_block_label, ""))
+            if next_block_label:
+                 edges.add((label, next_block_label, ""))
 
     # The logic above is designed to create the correct number of edges (E) for CC=E-N+2.
-    return list(set(edges))
+    return edges
 
 def escape_label(text):
-    text = text.replace("\\", "\\\\").replace("\"", "\\\"")
-    text = text.replace("{", "\\{").replace("}", "\\}")
-    text = text.replace("<", "\\<").replace(">", "\\>")
-    # text = text.replace("\n", "\\n")
-    return text
+    return text.translate(_ESCAPE_TABLE)
 
 def write_dot(blocks, edges, filename="cfg.dot"):
+    # Collect every line first and write the file in one go
+    parts = ["digraph CFG {\n", "node [shape=box, style=filled, color=lightgray];\n"]
+
+    # Add Start and End nodes
+    parts.append('Start [shape=oval, color=lightblue, label="Start"];\n')
+    parts.append('End [shape=oval, color=lightblue, label="End"];\n')
+
+    # Add basic blocks
+    for label, block in blocks:
+        code = "\n".join(block)
+        code = escape_label(code)
+        parts.append(f'{label} [label="{label}:\n{code}"];\n')
+
+    # Connect Start to first block
+    if blocks:
+        parts.append(f'Start -> {blocks[0][0]};\n')
+
+    # Add all edges
+    for src, dst, lbl in edges:
+        if lbl:
+            parts.append(f'{src} -> {dst} [label="{lbl}"];\n')
+        else:
+            parts.append(f'{src} -> {dst};\n')
+
+    # Connect return blocks to End
+    for label, block in blocks:
+        code = " ".join(block)
+        if "return" in code or "break" in code: # Also treating 'break' as an exit
+            parts.append(f'{label} -> End;\n')
+
+    parts.append("}\n")
+
     with open(filename, "w", encoding="utf-8") as f:
-        f.write("digraph CFG {\n")
-        f.write("node [shape=box, style=filled, color=lightgray];\n")
-
-        # Add Start and End nodes
-        f.write('Start [shape=oval, color=lightblue, label="Start"];\n')
-        f.write('End [shape=oval, color=lightblue, label="End"];\n')
-
-        # Add basic blocks
-        for label, block in blocks:
-            code = "\n".join(block)
-            code = escape_label(code)
-            f.write(f'{label} [label="{label}:\n{code}"];\n')
-
-        # Connect Start to first block
-        if blocks:
-            f.write(f'Start -> {blocks[0][0]};\n')
-
-        # Add all edges
-        for src, dst, lbl in edges:
-            if lbl:
-                f.write(f'{src} -> {dst} [label="{lbl}"];\n')
-            else:
-                f.write(f'{src} -> {dst};\n')
-
-        # Connect return blocks to End
-        for label, block in blocks:
-            code = " ".join(block)
-            if "return" in code or "break" in code: # Also treating 'break' as an exit
-                f.write(f'{label} -> End;\n')
-
-        f.write("}\n")
+        f.write("".join(parts))
 
     print(f"[+] CFG DOT file saved as {filename}")
 
@@ -153,7 +166,8 @@ def compute_predecessors(blocks, edges):
     for src, dst, _ in edges:
         if dst in preds:
             preds[dst].add(src)
-    return preds
+    # Sets only dedupe while collecting; callers get fixed, ordered tuples
+    return {label: tuple(sorted(p)) for label, p in preds.items()}
 
 def main():
     if len(sys.argv) < 2:
@@ -163,8 +177,8 @@ def main():
     with open(sys.argv[1], "r", encoding="utf-8") as f:
         code = f.read()
 
-    lines = preprocess_code(code)
-    leaders = find_leaders(lines)
+    lines, full_source = preprocess_code(code)
+    leaders = find_leaders(lines, full_source)
     blocks = create_basic_blocks(lines, leaders)
     
     # Using the corrected edge creation logic
@@ -179,17 +193,26 @@ def main():
 
 
 def analyze_cfg(filename):
+    # mtime and size in the key make an edited file miss the cache
+    st = os.stat(filename)
+    return _analyze_cfg_cached(filename, st.st_mtime, st.st_size)
+
+
+@lru_cache(maxsize=256)
+def _analyze_cfg_cached(filename, mtime, size):
 
     with open(filename, "r", encoding="utf-8") as f:
         code = f.read()
 
-    lines = preprocess_code(code)
-    leaders = find_leaders(lines)
+    lines, full_source = preprocess_code(code)
+    leaders = find_leaders(lines, full_source)
     blocks = create_basic_blocks(lines, leaders)
     edges = create_edges(blocks)
     N, E, CC = compute_metrics(blocks, edges)
 
-    return blocks, edges, N, E, CC
+    # Cached results are shared between callers, so hand out immutable copies
+    blocks = tuple((label, tuple(block)) for label, block in blocks)
+    return blocks, frozenset(edges), N, E, CC
 
 
 if __name__ == "__main__":
@@ -1,93 +1,194 @@
 # python reaching_defs.py <program.c>
+# Needs xlsxwriter for the workbook: pip install xlsxwriter
 
 import sys
 from cfg_cc import analyze_cfg, compute_predecessors
-import re
-import pandas as pd
+import xlsxwriter
 import os
+import heapq
+from functools import lru_cache
+
+_IDENT_START = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_")
+
+
+def assigned_names(line):
+    # Every "name = ...;" on the line, left to right. == is not an assignment, the
+    # ; may come after more declarators (int i = 0, j = 0;), and a name can't
+    # start with a digit.
+    names = []
+    semi = line.rfind(";")
+    i = line.find("=", 0, semi) if semi > 0 else -1
+    while i >= 0:
+        if line[i + 1] != "=":
+            j = i
+            while j > 0 and line[j - 1].isspace():
+                j -= 1
+            k = j
+            while k > 0 and (line[k - 1].isalnum() or line[k - 1] == "_"):
+                k -= 1
+            while k < j and line[k] not in _IDENT_START:
+                k += 1
+            if k < j:
+                names.append(line[k:j])
+        i = line.find("=", i + 1, semi)
+    return names
+
 
 def find_definitions(blocks):
+    # Block lines come from cfg_cc.preprocess_code already stripped
     definitions = {}
     def_id = 1
     var_defs = {}
+    gen = {label: 0 for label, _ in blocks}
+    kill = {label: 0 for label, _ in blocks}
 
     for label, block in blocks:
         for line in block:
-            match = re.match(r'.*([a-zA-Z_]\w*)\s*=\s*[^;]+;', line)
-            if match:
-                var = match.group(1)
+            # Most lines assign nothing; a substring test is far cheaper than the parse
+            if "=" not in line:
+                continue
+            for var in assigned_names(line):
                 d = f"D{def_id}"
-                definitions[d] = {"line": line.strip(), "var": var, "block": label}
-                var_defs.setdefault(var, set()).add(d)
+                bit = 1 << (def_id - 1)
+                definitions[d] = {"line": line, "var": var, "block": label}
+                gen[label] |= bit
+                # Each variable maps to the OR of the bits of all its definitions
+                var_defs[var] = var_defs.get(var, 0) | bit
                 def_id += 1
 
-    return definitions, var_defs
-
-
-def compute_gen_kill(blocks, definitions, var_defs):
-    gen = {}
-    kill = {}
-
-    for label, block in blocks:
-        gen[label] = set()
-        kill[label] = set()
-        for line in block:
-            for d, info in definitions.items():
-                if info["line"] == line.strip():
-                    var = info["var"]
-                    gen[label].add(d)
-                    kill[label].update(var_defs[var] - {d})
-    return gen, kill
-
-
-def compute_predecessors(blocks, edges):
-    preds = {label: set() for label, _ in blocks}
-    for src, dst, _ in edges:
-        if dst in preds:
-            preds[dst].add(src)
-    return preds
-
-
-def reaching_definitions(blocks, edges, definitions, var_defs):
-    gen, kill = compute_gen_kill(blocks, definitions, var_defs)
+    # A definition kills its variable's other definitions; those are only all
+    # known once every block has been scanned
+    for bit_index, info in enumerate(definitions.values()):
+        kill[info["block"]] |= var_defs[info["var"]] & ~(1 << bit_index)
+
+    return definitions, var_defs, gen, kill
+
+
+def reverse_postorder(succs):
+    # Iterative DFS from block 0 first, then from any block it did not reach
+    n = len(succs)
+    seen = [False] * n
+    order = []
+    for root in range(n):
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [(root, iter(succs[root]))]
+        while stack:
+            node, children = stack[-1]
+            for s in children:
+                if not seen[s]:
+                    seen[s] = True
+                    stack.append((s, iter(succs[s])))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+    order.reverse()
+    return order
+
+
+def reaching_definitions(blocks, edges, gen, kill, record_iterations=False):
+    # Generator of (iteration, table) snapshots: one per sweep when recording,
+    # otherwise a single (None, table) for the fixed point.
+    # gen/kill/in/out are int bitsets: bit k-1 set means D{k} is in the set
     preds = compute_predecessors(blocks, edges)
 
-    in_b = {label: set() for label, _ in blocks}
-    out_b = {label: set() for label, _ in blocks}
-
-    changed = True
+    # The solver works on block ids 0..n-1 so every lookup is a list index
+    labels = [label for label, _ in blocks]
+    index = {label: b for b, label in enumerate(labels)}
+    n = len(labels)
+    gen_arr = [gen[label] for label in labels]
+    kill_arr = [kill[label] for label in labels]
+    # Predecessors don't change between sweeps, so freeze them once; sorting
+    # keeps the DFS below, and so the sweep order, the same from run to run
+    pred_list = [tuple(sorted(index[p] for p in preds[label])) for label in labels]
+
+    succs = [[] for _ in range(n)]
+    for b, ps in enumerate(pred_list):
+        for p in ps:
+            succs[p].append(b)
+
+    # Visiting predecessors before successors lets a forward problem settle in
+    # about loop-nesting-depth + 2 sweeps
+    rpo = reverse_postorder(succs)
+
+    in_arr = [0] * n
+    out_arr = [0] * n
+
+    # Rows are (block, gen, kill, in, out); the bitsets are ints, so each row
+    # is an immutable copy of that sweep's values
+    def snapshot():
+        return [(labels[b], gen_arr[b], kill_arr[b], in_arr[b], out_arr[b]) for b in range(n)]
+
+    if not record_iterations:
+        # Worklist: a block is revisited only when one of its predecessors' out changed.
+        # It is a heap of reverse-postorder ranks, so predecessors are settled first
+        # and a forward problem converges in about one pass on reducible CFGs.
+        rank = [0] * n
+        for r, b in enumerate(rpo):
+            rank[b] = r
+
+        work = list(range(n))
+        in_work = [True] * n
+        while work:
+            b = rpo[heapq.heappop(work)]
+            in_work[b] = False
+            # in_arr[b] is kept up to date by the pushes below, so no predecessor union here
+            new_out = gen_arr[b] | (in_arr[b] & ~kill_arr[b])
+            # out sets only ever grow, so the newly added bits are all successors need
+            delta = new_out & ~out_arr[b]
+            if delta:
+                out_arr[b] = new_out
+                for s in succs[b]:
+                    in_arr[s] |= delta
+                    if not in_work[s]:
+                        heapq.heappush(work, rank[s])
+                        in_work[s] = True
+
+        yield None, snapshot()
+        return
+
+    # Sweeps in reverse postorder, keeping a table per sweep for the iteration
+    # sheets; rows stay in source order. A block is only recomputed when a
+    # predecessor's out changed since its last visit; otherwise its in/out would
+    # come out the same, so the tables match a full sweep.
+    dirty = [True] * n
     iteration = 0
-    results = []
 
-    while changed:
+    while True:
         iteration += 1
         changed = False
-        iteration_table = []
-
-        for label, _ in blocks:
-            new_in = set().union(*(out_b[p] for p in preds[label])) if preds[label] else set()
-            new_out = gen[label].union(new_in - kill[label])
 
-            if new_out != out_b[label]:
+        for b in rpo:
+            if not dirty[b]:
+                continue
+            dirty[b] = False
+            new_in = 0
+            for p in pred_list[b]:
+                new_in |= out_arr[p]
+            new_out = gen_arr[b] | (new_in & ~kill_arr[b])
+
+            # in can change on its own when the block kills the new bits, and
+            # that still has to show up in a sheet
+            if new_in != in_arr[b]:
                 changed = True
+            if new_out != out_arr[b]:
+                changed = True
+                for s in succs[b]:
+                    dirty[s] = True
 
-            in_b[label] = new_in
-            out_b[label] = new_out
-
-            iteration_table.append({
-                "Block": label,
-                "gen": gen[label],
-                "kill": kill[label],
-                "in": in_b[label],
-                "out": out_b[label]
-            })
-
-        results.append((iteration, iteration_table))
+            in_arr[b] = new_in
+            out_arr[b] = new_out
 
-    return results
+        # A sweep where neither in nor out moved repeats the previous table,
+        # so it gets no sheet (unless it is the only sweep)
+        if not changed and iteration > 1:
+            return
+        yield iteration, snapshot()
 
 
-def print_rd_results(results, filename, definitions):
+def stream_rd_results(results, filename, definitions):
     base = os.path.splitext(os.path.basename(filename))[0]
 
     # Save definitions to a separate .txt file
@@ -98,21 +199,38 @@ def print_rd_results(results, filename, definitions):
             f.write(f"{d}: Variable = {info['var']}, Block = {info['block']}, Line = {info['line']}\n")
     print(f"Definitions saved to {defs_filename}")
 
+    def_names = tuple(definitions)
+
+    # Sets repeat heavily across sweeps (gen/kill never change, converged
+    # blocks stay put), so each distinct mask is rendered only once
+    @lru_cache(maxsize=None)
+    def fmt(mask):
+        if not mask:
+            return "{}"
+        # Visit only the set bits: bit k-1 (lowest first) is D{k}
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(def_names[low.bit_length() - 1])
+            mask ^= low
+        # Sort by name (D1,D10,D2,...) so sheets read exactly as before
+        return "{" + ",".join(sorted(names)) + "}"
+
     # Save reaching definitions iterations to Excel
     xlsx_name = f"{base}_reaching_definitions.xlsx"
-    with pd.ExcelWriter(xlsx_name) as writer:
-        for iteration, table in results:
-            df = pd.DataFrame([
-                {
-                    "Basic Block": row["Block"],
-                    "gen[B]": "{" + ",".join(sorted(row["gen"])) + "}" if row["gen"] else "{}",
-                    "kill[B]": "{" + ",".join(sorted(row["kill"])) + "}" if row["kill"] else "{}",
-                    "in[B]": "{" + ",".join(sorted(row["in"])) + "}" if row["in"] else "{}",
-                    "out[B]": "{" + ",".join(sorted(row["out"])) + "}" if row["out"] else "{}"
-                }
-                for row in table
-            ])
-            df.to_excel(writer, sheet_name=f"Iteration_{iteration}", index=False)
+    # constant_memory streams each row to disk as soon as the next one starts
+    workbook = xlsxwriter.Workbook(xlsx_name, {"constant_memory": True})
+    # Same header look pandas' to_excel gave these sheets
+    header_fmt = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    # Each sweep's sheet is written as the solver yields it, so only one
+    # snapshot is alive at a time
+    for iteration, table in results:
+        sheet = f"Iteration_{iteration}" if iteration is not None else "Fixed_Point"
+        ws = workbook.add_worksheet(sheet)
+        ws.write_row(0, 0, ["Basic Block", "gen[B]", "kill[B]", "in[B]", "out[B]"], header_fmt)
+        for r, (label, *sets) in enumerate(table, start=1):
+            ws.write_row(r, 0, [label, *map(fmt, sets)])
+    workbook.close()
 
     print(f"Reaching Definitions saved to {xlsx_name}")
 
@@ -128,10 +246,11 @@ def main():
     print(f"Using CFG from {filename}")
     print(f"{N} blocks, {E} edges, CC = {CC}")
 
-    definitions, var_defs = find_definitions(blocks)
-    results = reaching_definitions(blocks, edges, definitions, var_defs)
+    definitions, _, gen, kill = find_definitions(blocks)
+    # The per-iteration sheets are the report, so record every sweep
+    results = reaching_definitions(blocks, edges, gen, kill, record_iterations=True)
 
-    print_rd_results(results, filename, definitions)
+    stream_rd_results(results, filename, definitions)
 
 
 if __name__ == "__main__":